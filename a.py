@@ -3,6 +3,8 @@
 Updated scraper + Telegram notifier
 - Uses verify=False for scraping (suppresses SSL cert errors) as requested
 - Robust network handling (retries/backoff)
+- Page downloads run ahead in a small thread pool (one request at a time per host);
+  parsing/notifying stays sequential
 - Article-level parsing for title/link/date (handles patterns like elementor-post-date)
 - Date parsing via dateparser (supports natural language and many formats)
 - Sends notifications only when date == today OR date == tomorrow OR text contains 'today'/'tomorrow'
@@ -11,14 +13,20 @@ Updated scraper + Telegram notifier
 
 import os
 import re
+import sys
 import time
 import logging
-from datetime import datetime, timedelta
-from urllib.parse import urlparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from html import escape
+from urllib.parse import urljoin, urlparse
 
 import requests
 import dateparser
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from requests.exceptions import (
@@ -29,11 +37,12 @@ from requests.exceptions import (
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Optional HuggingFace pipeline (may be heavy)
+# lxml's C parser is several times faster than html.parser; fall back if not installed
 try:
-    from transformers import pipeline
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
 except Exception:
-    pipeline = None
+    HTML_PARSER = "html.parser"
 
 # Try to import urls list from urls.py; fallback to empty list
 try:
@@ -50,19 +59,35 @@ TOKEN = os.getenv("TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 SENT_FILE = "sent_links.txt"
 
-# Time logic
-TODAY = datetime.now().date()
+# Time logic: read the clock once per run; everything date-related derives from it
+RUN_STARTED = datetime.now()
+TODAY = RUN_STARTED.date()
 TOMORROW = TODAY + timedelta(days=1)
+TARGET_ORDINALS = frozenset((TODAY.toordinal(), TOMORROW.toordinal()))
 
 print("[2] Environment variables loaded (TOKEN set? {})".format(bool(TOKEN)))
 
 # ---------- Telegram helper ----------
+TELEGRAM_URL = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
+
+# Telegram allows about 20 messages per minute into one group; wait only when a
+# burst would exceed that instead of sleeping after every send
+TELEGRAM_MAX_PER_MINUTE = 20
+_telegram_sent_at = deque()
+
+def _wait_for_telegram_slot():
+    now = time.monotonic()
+    while _telegram_sent_at and now - _telegram_sent_at[0] >= 60:
+        _telegram_sent_at.popleft()
+    if len(_telegram_sent_at) >= TELEGRAM_MAX_PER_MINUTE:
+        time.sleep(60 - (now - _telegram_sent_at.popleft()))
+    _telegram_sent_at.append(time.monotonic())
+
 def send_telegram(message):
     """Send a message only if TOKEN/CHAT_ID exist. Keep Telegram requests verified (secure)."""
     if not TOKEN or not CHAT_ID:
         logging.warning("Telegram TOKEN or CHAT_ID not set — skipping send_telegram")
         return False
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
     payload = {
         "chat_id": CHAT_ID,
         "text": message,
@@ -70,19 +95,52 @@ def send_telegram(message):
         "disable_web_page_preview": False,
     }
     try:
+        _wait_for_telegram_slot()
         logging.info("[7] Sending Telegram message: %.60s...", message)
-        r = requests.post(url, data=payload, timeout=15)  # default verify=True
+        # Pooled session (keep-alive to api.telegram.org); re-enable TLS verification it disables for scraping
+        r = session.post(TELEGRAM_URL, data=payload, timeout=15, verify=True)
         logging.info("[7.1] Telegram API response: %s", r.text)
         return r.ok
     except Exception as e:
         logging.error("[ERROR] Telegram Error: %s", e)
         return False
 
-# Notify start (best-effort)
-send_telegram("✅ Script has started")
+# Telegram rejects messages over 4096 chars; leave headroom for the HTML markup
+TELEGRAM_BATCH_CHARS = 3800
+BATCH_SEPARATOR = "\n\n"
+
+def send_telegram_batched(items, limit=TELEGRAM_BATCH_CHARS):
+    """
+    Send (link, message) pairs packed into as few Telegram messages as fit under limit.
+    Returns the links whose message was delivered, so only those get marked as sent.
+    If a combined message is rejected, its items are retried one by one so a single bad
+    item doesn't hold back the rest of its batch.
+    """
+    delivered = []
+    batch = []
+    size = 0
+
+    def flush():
+        if not batch:
+            return
+        if send_telegram(BATCH_SEPARATOR.join(message for _, message in batch)):
+            delivered.extend(link for link, _ in batch)
+        elif len(batch) > 1:
+            logging.warning("Batch of %d messages failed, resending one at a time", len(batch))
+            delivered.extend(link for link, message in batch if send_telegram(message))
+
+    for link, message in items:
+        if batch and size + len(BATCH_SEPARATOR) + len(message) > limit:
+            flush()
+            batch, size = [], 0
+        size += (len(BATCH_SEPARATOR) if batch else 0) + len(message)
+        batch.append((link, message))
+    flush()
+    return delivered
 
 # ---------- Network session with retries ----------
-def create_session(retries=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504)):
+def create_session(retries=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                   pool_connections=32, pool_maxsize=10):
     session = requests.Session()
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -100,13 +158,24 @@ def create_session(retries=3, backoff_factor=1, status_forcelist=(429, 500, 502,
         backoff_factor=backoff_factor,
         raise_on_status=False
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # pool_connections = hosts kept alive at once; the crawl hits many hosts in parallel
+    # and revisits some (several pages per board), so keep more than the default 10
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
+    # Scraping only: many govt sites have broken cert chains (warnings disabled above)
+    session.verify = False
     return session
 
 session = create_session(retries=3, backoff_factor=1)
 
+# Notify start (best-effort)
+send_telegram("✅ Script has started")
+
+# Listing pages are small; anything bigger is usually a linked PDF/ZIP, not HTML
+MAX_PAGE_BYTES = 2_000_000
+PAGE_CONTENT_TYPES = ("html", "xml", "text/")
+
 # ---------- Safe GET with insecure verify (as requested) ----------
 def ensure_scheme(url):
     parsed = urlparse(url)
@@ -116,23 +185,18 @@ def ensure_scheme(url):
 
 def safe_get(session, url, timeout=(10, 30)):
     """
-    GET a URL robustly. This implementation intentionally uses verify=False to bypass SSL cert errors.
+    GET a URL robustly with verify=False to bypass SSL cert errors. It is passed per call as well
+    as set on the session: requests replaces a session-only verify=False with REQUESTS_CA_BUNDLE /
+    CURL_CA_BUNDLE when either is set in the environment.
+    The body is streamed; read it with read_body() so oversized pages are capped.
     Returns (response, error_message). Response can be None if failed.
     """
     url = ensure_scheme(url)
     try:
-        # Try HEAD first (some servers block HEAD)
-        try:
-            h = session.head(url, timeout=timeout, allow_redirects=True, verify=False)
-            if h.status_code and h.status_code < 400:
-                r = session.get(url, timeout=timeout, allow_redirects=True, verify=False)
-                r.raise_for_status()
-                return r, None
-        except RequestException:
-            # HEAD failed, proceed with GET
-            pass
-
-        r = session.get(url, timeout=timeout, allow_redirects=True, verify=False)
+        # No HEAD preflight: it cost an extra round-trip per page and the GET reports the same errors
+        r = session.get(url, timeout=timeout, allow_redirects=True, stream=True, verify=False)
+        if not r.ok:
+            r.close()  # streamed: release the connection before raising
         r.raise_for_status()
         return r, None
 
@@ -157,11 +221,34 @@ def safe_get(session, url, timeout=(10, 30)):
         logging.warning("RequestException for %s: %s", url, e)
         return None, f"RequestException: {e}"
 
+def read_body(r, max_bytes=MAX_PAGE_BYTES):
+    """
+    Read at most max_bytes of a streamed response and close it.
+    Returns (body_bytes, charset); charset is None unless the server declared one,
+    so BeautifulSoup can sniff <meta charset> itself.
+    """
+    chunks = []
+    total = 0
+    try:
+        for chunk in r.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= max_bytes:
+                logging.warning("Body of %s exceeds %d bytes, truncating", r.url, max_bytes)
+                break
+    except RequestException as e:
+        logging.warning("Error while reading body of %s: %s", r.url, e)
+    finally:
+        r.close()
+    charset = r.encoding if "charset" in r.headers.get("Content-Type", "").lower() else None
+    return b"".join(chunks)[:max_bytes], charset
+
 # ---------- Sent links persistence ----------
 def load_sent_links():
     try:
         with open(SENT_FILE, "r", encoding="utf-8") as f:
-            links = set(line.strip() for line in f if line.strip())
+            stripped = (line.strip() for line in f)
+            links = {sys.intern(line) for line in stripped if line}
             print(f"[5] Loaded {len(links)} sent links")
             return links
     except FileNotFoundError:
@@ -171,16 +258,77 @@ def load_sent_links():
         logging.error("Error reading sent_links file: %s", e)
         return set()
 
-def save_sent_link(link):
+def save_sent_links(links):
+    """Append a batch of links (one site's worth) with a single open/write."""
+    if not links:
+        return
     try:
         with open(SENT_FILE, "a", encoding="utf-8") as f:
-            f.write(link + "\n")
-        print(f"[6] Saved link: {link}")
+            f.write("".join(link + "\n" for link in links))
+        logging.info("[6] Saved %d links: %s", len(links), ", ".join(links))
     except Exception as e:
-        logging.error("Failed to save link %s: %s", link, e)
+        logging.error("Failed to save links %s: %s", links, e)
 
 # ---------- Date extraction (improved) ----------
+# Fallback date shapes for extract_date_from_text as one alternation, so the text is
+# scanned once rather than once per shape. Matched against lowercased text.
+MONTH_NAMES = ("january", "february", "march", "april", "may", "june", "july",
+               "august", "september", "october", "november", "december")
+MONTHS = "(?:" + "|".join(MONTH_NAMES) + ")"
+DATE_RE = re.compile(
+    r'(?P<dmy>\d{1,2}[-/]\d{1,2}[-/]\d{4})'
+    r'|(?P<ymd>\d{4}[-/]\d{2}[-/]\d{2})'
+    r'|(?P<dotted>\d{1,2}[.]\d{1,2}[.]\d{4})'
+    r'|(?P<month_day>' + MONTHS + r'[\s\-]+\d{1,2},?\s*\d{4})'
+    r'|(?P<day_month>\d{1,2}\s+' + MONTHS + r'\s+\d{4})'
+)
+
+# RELATIVE_BASE pins "2 days ago" & co. to the same instant as TODAY instead of
+# dateparser reading the clock again on every call
+FREE_TEXT_SETTINGS = {'PREFER_DAY_OF_MONTH': 'first', 'DATE_ORDER': 'DMY', 'RELATIVE_BASE': RUN_STARTED}
+MATCHED_DATE_SETTINGS = {'DATE_ORDER': 'DMY', 'RELATIVE_BASE': RUN_STARTED}
+MAX_FREE_TEXT_DATE_LEN = 64
+
+@lru_cache(maxsize=4096)
+def parse_date_cached(text, free_text=False):
+    """
+    dateparser.parse(...).date() or None. dateparser is the slowest step here and the
+    same strings (shared containers, repeated date tokens) recur across links and pages.
+    """
+    try:
+        dt = dateparser.parse(text, settings=FREE_TEXT_SETTINGS if free_text else MATCHED_DATE_SETTINGS)
+    except Exception:
+        return None
+    return dt.date() if dt else None
+
+DIGIT_RE = re.compile(r"\d")
+DATE_PART_SPLIT_RE = re.compile(r"[-/.,\s]+")
+MONTH_NUMBERS = {name: i for i, name in enumerate(MONTH_NAMES, 1)}
+
+def parse_date_match(kind, matched):
+    """
+    Build the date for a DATE_RE hit straight from its fields (kind = lastgroup).
+    Falls back to dateparser only for odd cases such as month > 12 (US m/d/Y order).
+    """
+    parts = DATE_PART_SPLIT_RE.split(matched)
+    try:
+        if kind == "ymd":
+            y, m, d = parts
+        elif kind == "month_day":
+            m, d, y = parts
+            m = MONTH_NUMBERS[m]
+        elif kind == "day_month":
+            d, m, y = parts
+            m = MONTH_NUMBERS[m]
+        else:  # dmy, dotted
+            d, m, y = parts
+        return date(int(y), int(m), int(d))
+    except (ValueError, KeyError):
+        return parse_date_cached(matched)
+
+@lru_cache(maxsize=8192)
 def extract_date_from_text(text):
+    """Date mentioned in text, or None. Cached: container text recurs across sibling links."""
     if not text:
         return None
     lower = text.lower()
@@ -188,35 +336,29 @@ def extract_date_from_text(text):
         return TODAY
     if "tomorrow" in lower:
         return TOMORROW
-
-    try:
-        dt = dateparser.parse(text, settings={'PREFER_DAY_OF_MONTH': 'first', 'DATE_ORDER': 'DMY'})
-        if dt:
-            return dt.date()
-    except Exception:
-        pass
-
-    patterns = [
-        r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})',
-        r'(\d{4})[-/](\d{2})[-/](\d{2})',
-        r'(\d{1,2})[.](\d{1,2})[.](\d{4})',
-        r'(january|february|march|april|may|june|july|august|september|october|november|december)[\s\-]+(\d{1,2}),?\s*(\d{4})'
-    ]
-    text_lower = text.lower()
-    for pattern in patterns:
-        m = re.search(pattern, text_lower)
-        if m:
-            try:
-                dt = dateparser.parse(m.group(0), settings={'DATE_ORDER': 'DMY'})
-                if dt:
-                    return dt.date()
-            except Exception:
-                continue
+    # Every DATE_RE shape contains a digit; digit-less text skips the scan but can
+    # still be a relative label for dateparser below
+    if DIGIT_RE.search(text):
+        for m in DATE_RE.finditer(lower):
+            parsed = parse_date_match(m.lastgroup, m.group(m.lastgroup))
+            if parsed:
+                return parsed
+
+    # Free-text dateparser is the slow path: only worth trying on short, date-sized
+    # strings ("Oct 5, 2024", "2 days ago", "just now", "आज"), never on paragraphs.
+    # No digit requirement here: relative labels often have none.
+    if len(text) <= MAX_FREE_TEXT_DATE_LEN:
+        return parse_date_cached(text, True)
     return None
 
 # ---------- Classifier (zero-shot) with fallback ----------
+# Loaded on first use: importing transformers/torch and the model takes seconds and
+# hundreds of MB, and runs where every link matches KEYWORD_RE never need it.
+@lru_cache(maxsize=1)
 def load_classifier():
-    if pipeline is None:
+    try:
+        from transformers import pipeline
+    except Exception:
         logging.warning("transformers.pipeline not available - skipping model load")
         return None
     try:
@@ -228,17 +370,22 @@ def load_classifier():
         logging.error("Failed to load AI model: %s", e)
         return None
 
-classifier = load_classifier()
-
 KEYWORD_FALLBACK = [
     "notification", "result", "admit", "admit card", "apply", "recruitment", "vacancy",
     "shortlist", "interview", "answer key", "notice", "counselling", "merit list",
 ]
+# One case-insensitive scan instead of a substring test per keyword
+KEYWORD_RE = re.compile("|".join(map(re.escape, KEYWORD_FALLBACK)), re.I)
 
 def is_recent_notification(text):
     if not text:
         return False
     txt = text.strip()
+    # The result is classifier OR keyword match, so try the cheap keyword scan first
+    # and only run the model for texts it doesn't already accept.
+    if KEYWORD_RE.search(txt):
+        return True
+    classifier = load_classifier()
     if classifier:
         try:
             labels = ["recent notification", "old notification"]
@@ -252,82 +399,211 @@ def is_recent_notification(text):
                 if res and isinstance(res, list) and res[0].get('label') == "recent notification" and res[0].get('score', 0) > 0.7:
                     return True
         except Exception as e:
-            logging.warning("[AI ERROR] classifier failed: %s. Falling back to keyword check.", e)
-
-    lowered = txt.lower()
-    for kw in KEYWORD_FALLBACK:
-        if kw in lowered:
-            return True
+            logging.warning("[AI ERROR] classifier failed: %s", e)
     return False
 
 # ---------- Article parsing ----------
+# hrefs that never point at a notification; checked with str.startswith/endswith on tuples.
+# Images other than icons are kept: some boards post scanned notices as .jpg/.png.
+SKIP_HREF_PREFIXES = ("#", "mailto:", "javascript:", "tel:")
+SKIP_HREF_SUFFIXES = (".css", ".js", ".ico", ".svg")
+
+# Page-structure and date-context patterns, compiled once instead of per page/link
+ARTICLE_CLASS_RE = re.compile(r"(post|article|entry|elementor-post|news|notice|blog)", re.I)
+HEADING_RE = re.compile("^h[1-6]$")
+DATE_CLASS_RE = re.compile(r"(date|post-date|elementor-post-date|entry-date|posted-on)", re.I)
+SNIPPET_DATE_RE = re.compile(r'((?:\d{1,2}[-/\.]\d{1,2}[-/\.]\d{2,4})|(?:\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\b [\d]{1,2},? ?\d{2,4}))', re.I)
+NEARBY_DATE_RE = re.compile(r'\b(today|tomorrow|[A-Za-z]{3,}\s\d{1,2}|[0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4})', re.I)
+TODAY_TOMORROW_RE = re.compile(r'\b(today|tomorrow)\b', re.I)
+
+def is_content_href(href):
+    # Also used as a find() attribute filter, which passes None for anchors without href
+    if not href:
+        return False
+    h = href.strip().lower()
+    return bool(h) and not h.startswith(SKIP_HREF_PREFIXES) and not h.endswith(SKIP_HREF_SUFFIXES)
+
+def resolve_link(base_url, href):
+    """urljoin(base_url, href), skipping the URL parse for hrefs that are already absolute."""
+    if href.startswith(("https://", "http://")):
+        return href
+    return urljoin(base_url, href)
+
+def link_text(tag):
+    """Same as tag.get_text(strip=True), skipping the tree walk when the tag holds a single string."""
+    s = tag.string
+    if type(s) is NavigableString:  # not a Comment/CData, which get_text() ignores
+        return s.strip()
+    return tag.get_text(strip=True)
+
 def find_articles(soup):
     articles = []
     for tagname in ("article", "div", "li"):
-        found = soup.find_all(tagname, class_=re.compile(r"(post|article|entry|elementor-post|news|notice|blog)", re.I))
+        found = soup.find_all(tagname, class_=ARTICLE_CLASS_RE)
         if found:
             articles.extend(found)
     if not articles:
         articles = soup.find_all("article")
     return articles
 
-def extract_from_article(article, base_url):
-    link_tag = article.find("a", href=True)
+def extract_link_from_article(article, base_url):
+    # Filter in find() so a leading "#top"/javascript: anchor is skipped, not the article
+    link_tag = article.find("a", href=is_content_href)
     if not link_tag:
-        heading = article.find(re.compile("^h[1-6]$"))
+        heading = article.find(HEADING_RE)
         if heading:
-            link_tag = heading.find("a", href=True)
+            link_tag = heading.find("a", href=is_content_href)
 
     if not link_tag:
-        return None, None, None, None
+        return None, None
 
-    title = link_tag.get_text(strip=True) or link_tag.get("title") or ""
     href = link_tag.get("href")
-    full_link = requests.compat.urljoin(base_url, href)
+    title = link_text(link_tag) or link_tag.get("title") or ""
+    full_link = resolve_link(base_url, href)
+    return title, full_link
 
-    date_text = None
+def article_date_candidates(article):
+    """Date texts from article in order of reliability, produced lazily."""
     time_tag = article.find("time")
     if time_tag:
-        date_text = time_tag.get("datetime") or time_tag.get_text(strip=True)
+        yield time_tag.get("datetime") or time_tag.get_text(strip=True)
 
-    if not date_text:
-        date_like = article.find(["span", "div"], class_=re.compile(r"(date|post-date|elementor-post-date|entry-date|posted-on)", re.I))
-        if date_like:
-            date_text = date_like.get_text(strip=True)
+    date_like = article.find(["span", "div"], class_=DATE_CLASS_RE)
+    if date_like:
+        yield date_like.get_text(strip=True)
 
-    if not date_text:
-        meta_date = article.find("meta", attrs={"itemprop": "datePublished"}) or article.find("meta", attrs={"name": "date"})
-        if meta_date and meta_date.get("content"):
-            date_text = meta_date.get("content")
+    meta_date = article.find("meta", attrs={"itemprop": "datePublished"}) or article.find("meta", attrs={"name": "date"})
+    if meta_date:
+        yield meta_date.get("content")
 
-    if not date_text:
-        text_snippet = article.get_text(" ", strip=True)
-        m = re.search(r'((?:\d{1,2}[-/\.]\d{1,2}[-/\.]\d{2,4})|(?:\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\b [\d]{1,2},? ?\d{2,4}))', text_snippet, re.I)
-        if m:
-            date_text = m.group(1)
+    text_snippet = article.get_text(" ", strip=True)
+    m = SNIPPET_DATE_RE.search(text_snippet)
+    if m:
+        yield m.group(1)
 
-    parsed_date = extract_date_from_text(date_text) if date_text else None
+def extract_date_from_article(article):
+    """
+    (date_text, parsed_date) from the first candidate that parses; a candidate that
+    doesn't (e.g. an odd <time> label) falls through to the next one. If none parse,
+    the first non-empty date_text is returned with None.
+    """
+    first_text = None
+    for date_text in article_date_candidates(article):
+        if not date_text:
+            continue
+        parsed_date = extract_date_from_text(date_text)
+        if parsed_date:
+            return date_text, parsed_date
+        if first_text is None:
+            first_text = date_text
+    return first_text, None
+
+def find_container_date(cont, cache):
+    """
+    Date text from a <time>, date-classed span/div or datePublished <meta> inside cont,
+    or None. Links in the same row/list share containers, so results are memoized in
+    cache (keyed by node id, valid for one parsed page).
+    """
+    key = id(cont)
+    if key in cache:
+        return cache[key]
 
-    return title, full_link, date_text, parsed_date
+    date_text = None
+    t = cont.find("time")
+    if t:
+        date_text = t.get("datetime") or t.get_text(strip=True)
+    else:
+        d = cont.find(["span", "div"], class_=DATE_CLASS_RE)
+        if d:
+            date_text = d.get_text(strip=True)
+        else:
+            m = cont.find("meta", attrs={"itemprop": "datePublished"})
+            if m and m.get("content"):
+                date_text = m.get("content")
+
+    cache[key] = date_text
+    return date_text
+
+def is_target_date(date_text, parsed_date):
+    """True if date_text mentions today/tomorrow or parsed_date is today/tomorrow."""
+    if date_text and isinstance(date_text, str) and TODAY_TOMORROW_RE.search(date_text):
+        return True
+    # One int set lookup per link instead of two date comparisons
+    return parsed_date is not None and parsed_date.toordinal() in TARGET_ORDINALS
 
 # ---------- Main site checker ----------
-def check_site(url, sent_links):
+# Politeness is per host: different sites download in parallel, but each host
+# gets one request at a time with at least HOST_DELAY seconds between them.
+HOST_DELAY = 1.0
+_host_locks = {}
+_host_last_fetch = {}
+_host_locks_guard = threading.Lock()
+
+def _host_lock(host):
+    with _host_locks_guard:
+        lock = _host_locks.get(host)
+        if lock is None:
+            lock = _host_locks[host] = threading.Lock()
+        return lock
+
+def fetch_page(url):
+    """
+    Download a listing page. Returns (body, charset, error_message); body is None on failure.
+    Runs in worker threads, so it never raises.
+    """
+    host = urlparse(url).netloc
+    with _host_lock(host):
+        wait = HOST_DELAY - (time.monotonic() - _host_last_fetch.get(host, float("-inf")))
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            r, err = safe_get(session, url, timeout=(10, 30))
+            if r is None:
+                return None, None, err
+            # Headers arrive before the streamed body: don't download PDFs/images/archives
+            ctype = r.headers.get("Content-Type", "").lower()
+            if ctype and not any(t in ctype for t in PAGE_CONTENT_TYPES):
+                r.close()
+                return None, None, f"Not an HTML page (Content-Type: {ctype})"
+            body, charset = read_body(r)
+            return body, charset, None
+        except Exception as e:
+            logging.exception("Unexpected error while fetching %s: %s", url, e)
+            return None, None, f"Unexpected error: {e}"
+        finally:
+            _host_last_fetch[host] = time.monotonic()
+
+def build_message(title, full_link, date_text, parsed_date, source_url):
+    """Telegram HTML message for one link; scraped values are escaped so a stray < or & can't break parse_mode=HTML."""
+    return (
+        f"<b>{escape(title)}</b>\n"
+        f"🔗 <a href=\"{escape(full_link)}\">Open Notification</a>\n"
+        f"📅 {escape(str(date_text if date_text else parsed_date))}\n"
+        f"🌐 Source Page: <a href=\"{escape(source_url)}\">{escape(source_url)}</a>"
+    )
+
+def check_site(url, sent_links, page=None, selector=None):
+    """
+    Parse one listing page and notify about new links. page is a prefetched fetch_page()
+    result; selector (CSS) limits the scan to matching links instead of the whole page.
+    """
     url = ensure_scheme(url)
     logging.info("[8] Checking site: %s", url)
-    r, err = safe_get(session, url, timeout=(10, 30))
-    if r is None:
+    body, charset, err = page if page is not None else fetch_page(url)
+    if body is None:
         logging.error("Failed to scrape %s: %s", url, err)
         return
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(body, HTML_PARSER, from_encoding=charset)
 
-    articles = find_articles(soup)
+    articles = [] if selector else find_articles(soup)
     processed = 0
     found_links = set()
+    pending = []
     if articles:
         logging.info("[9] Found %d article-like containers", len(articles))
         for art in articles:
-            title, full_link, date_text, parsed_date = extract_from_article(art, url)
+            title, full_link = extract_link_from_article(art, url)
             if not full_link:
                 continue
             if full_link in found_links:
@@ -335,18 +611,15 @@ def check_site(url, sent_links):
             found_links.add(full_link)
             processed += 1
 
-            date_ok = False
-            if date_text and isinstance(date_text, str) and re.search(r'\b(today|tomorrow)\b', date_text, re.I):
-                date_ok = True
-            elif parsed_date and (parsed_date == TODAY or parsed_date == TOMORROW):
-                date_ok = True
-
-            if not date_ok:
-                logging.debug("Skipping (not today/tomorrow): %s | date_text=%s parsed=%s", title, date_text, parsed_date)
+            # Cheap set lookup before any date parsing for links we already sent
+            if full_link in sent_links:
+                logging.debug("[11] Skipped duplicate link: %s", full_link)
                 continue
 
-            if full_link in sent_links:
-                logging.info("[11] Skipped duplicate link: %s", full_link)
+            date_text, parsed_date = extract_date_from_article(art)
+
+            if not is_target_date(date_text, parsed_date):
+                logging.debug("Skipping (not today/tomorrow): %s | date_text=%s parsed=%s", title, date_text, parsed_date)
                 continue
 
             check_text = title or date_text or full_link
@@ -354,29 +627,25 @@ def check_site(url, sent_links):
                 logging.info("[10] Skipped by AI/keyword filter: %s", title)
                 continue
 
-            message = (
-                f"<b>{title}</b>\n"
-                f"🔗 <a href=\"{full_link}\">Open Notification</a>\n"
-                f"📅 {date_text if date_text else parsed_date}\n"
-                f"🌐 Source Page: <a href=\"{url}\">{url}</a>"
-            )
-            send_telegram(message)
-            save_sent_link(full_link)
-            sent_links.add(full_link)
+            pending.append((full_link, build_message(title, full_link, date_text, parsed_date, url)))
 
     else:
-        links = soup.find_all("a", href=True)
+        links = soup.select(selector) if selector else soup.find_all("a", href=True)
         logging.info("[9] Found %d links", len(links))
+        container_dates = {}
         for link in links:
-            text = link.get_text(strip=True)
             href = link.get("href")
-            if not href:
+            if not href or not is_content_href(href):
                 continue
-            full_link = requests.compat.urljoin(url, href)
+            full_link = resolve_link(url, href)
             if full_link in found_links:
                 continue
             found_links.add(full_link)
 
+            if full_link in sent_links:
+                logging.debug("[11] Skipped duplicate link: %s", full_link)
+                continue
+
             date_text = None
             parsed_date = None
             parent = link.parent
@@ -384,69 +653,98 @@ def check_site(url, sent_links):
             for cont in search_containers:
                 if not cont:
                     continue
-                t = cont.find("time")
-                if t:
-                    date_text = t.get("datetime") or t.get_text(strip=True)
-                    break
-                d = cont.find(["span", "div"], class_=re.compile(r"(date|post-date|elementor-post-date|entry-date|posted-on)", re.I))
-                if d:
-                    date_text = d.get_text(strip=True)
-                    break
-                m = cont.find("meta", attrs={"itemprop": "datePublished"})
-                if m and m.get("content"):
-                    date_text = m.get("content")
+                date_text = find_container_date(cont, container_dates)
+                if date_text is not None:
                     break
 
             if not date_text:
-                sib_prev = link.find_previous(string=re.compile(r'\b(today|tomorrow|[A-Za-z]{3,}\s\d{1,2}|[0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4})', re.I))
+                sib_prev = link.find_previous(string=NEARBY_DATE_RE)
                 if sib_prev:
                     date_text = sib_prev.strip()
 
             if date_text:
                 parsed_date = extract_date_from_text(date_text)
 
-            date_ok = False
-            if date_text and re.search(r'\b(today|tomorrow)\b', date_text, re.I):
-                date_ok = True
-            elif parsed_date and (parsed_date == TODAY or parsed_date == TOMORROW):
-                date_ok = True
-
-            if not date_ok:
-                continue
-
-            if full_link in sent_links:
-                logging.info("[11] Skipped duplicate link: %s", full_link)
+            if not is_target_date(date_text, parsed_date):
                 continue
 
+            # Only links that passed the href/sent/date checks pay for the text walk
+            text = link_text(link)
             check_text = text or date_text or full_link
             if not is_recent_notification(check_text):
                 logging.info("[10] Skipped by AI/keyword filter: %s", check_text[:80])
                 continue
 
-            message = (
-                f"<b>{text}</b>\n"
-                f"🔗 <a href=\"{full_link}\">Open Notification</a>\n"
-                f"📅 {date_text if date_text else parsed_date}\n"
-                f"🌐 Source Page: <a href=\"{url}\">{url}</a>"
-            )
-            send_telegram(message)
-            save_sent_link(full_link)
-            sent_links.add(full_link)
+            pending.append((full_link, build_message(text, full_link, date_text, parsed_date, url)))
 
+    # One Telegram request per ~4 KB of notifications instead of one per link
+    new_links = send_telegram_batched(pending)
+    sent_links.update(sys.intern(link) for link in new_links)
+    save_sent_links(new_links)
     logging.info("[done] Processed %d candidate links on %s", processed, url)
 
 # ---------- Main run ----------
+FETCH_WORKERS = 8
+
+def prefetch_pages(targets, workers=FETCH_WORKERS):
+    """
+    Yield fetch_page() results in input order while up to 2*workers downloads run ahead
+    in a thread pool. The lookahead is bounded so page bodies don't pile up in
+    memory when parsing/classification is slower than the network.
+    """
+    it = iter(targets)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for u in it:
+            pending.append(pool.submit(fetch_page, u))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            future = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(pool.submit(fetch_page, nxt))
+            yield future.result()
+
+def parse_target(entry):
+    """urls.py entries are "url" or ("url", "css selector"); returns (url, selector or None)."""
+    if isinstance(entry, (tuple, list)):
+        url, selector = entry
+    else:
+        url, selector = entry, None
+    if not isinstance(url, str) or not (selector is None or isinstance(selector, str)):
+        raise TypeError("expected a url string and optional selector string")
+    return ensure_scheme(url), selector
+
 def run_monitor():
     sent_links = load_sent_links()
     if not urls:
         logging.warning("No URLs provided in `urls` list. Exiting.")
         return
-    for u in urls:
+    # A malformed urls.py entry is skipped, not allowed to abort the whole run
+    parsed = []
+    for entry in urls:
         try:
-            check_site(u, sent_links)
-            time.sleep(1)  # polite delay
-        except Exception as e:
-            logging.exception("Unexpected error while checking %s: %s", u, e)
+            parsed.append(parse_target(entry))
+        except (TypeError, ValueError) as e:
+            logging.warning("Skipping malformed urls.py entry %r: %s", entry, e)
+    # urls.py lists some pages more than once; fetch and scan each (url, selector) once
+    targets = list(dict.fromkeys(parsed))
+    if len(targets) < len(parsed):
+        logging.info("Skipping %d duplicate URL entries", len(parsed) - len(targets))
+    # A page listed with several selectors is downloaded once and scanned per selector
+    selectors_by_url = {}
+    for u, selector in targets:
+        selectors_by_url.setdefault(u, []).append(selector)
+    # Only the downloads overlap; parsing, Telegram sends and sent_links updates
+    # stay on this thread, in order of each URL's first appearance in urls.py.
+    pages = prefetch_pages(list(selectors_by_url))
+    for (u, selectors), page in zip(selectors_by_url.items(), pages):
+        for selector in selectors:
+            try:
+                check_site(u, sent_links, page, selector)
+            except Exception as e:
+                logging.exception("Unexpected error while checking %s: %s", u, e)
 
 if __name__ == "__main__":
     run_monitor()
@@ -1,4 +1,6 @@
 # url.py
+# An entry can also be ("url", "css selector") to scan only the matching links,
+# e.g. ("https://example.gov.in/notices", "div.notice-board a[href]")
 urls = [
 "https://jobshikhar.in",
 "https://cdn.digialm.com/EForms/configuredHtml/1258/95554/Index.html",